@@ -4,16 +4,36 @@ from __future__ import annotations
 
 import datetime
 import re
+from functools import lru_cache
+from typing import NamedTuple
 import tkinter as tk
 from tkinter import filedialog, simpledialog
 
 import jpholiday
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.formatting.rule import FormulaRule
-from openpyxl.styles import Border, Font, PatternFill, Side
+from openpyxl.styles import Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.workbook.defined_name import DefinedName
+
+WHITESPACE_RE = re.compile(r"\s+")
+DATE_LABEL_RE = re.compile(r"日\s*付")
+YEAR_RE = re.compile(r"(20\d{2})")
+DATE_COLUMN_NAMES = frozenset({"日付", "宿泊日", "date"})
+# キャパシティを保持するブック単位の名前付き定数
+CAPACITY_NAME = "CAPACITY"
+
+
+class SheetInfo(NamedTuple):
+    """Where a month sheet's totals live, for the annual sheets to reference."""
+
+    sheet: str
+    total_row: int
+    data_end_row: int
 
 
 def find_date_column(df: pd.DataFrame) -> str:
@@ -26,18 +46,67 @@ def find_date_column(df: pd.DataFrame) -> str:
     """
 
     normalized = {c.strip().lower(): c for c in df.columns}
-    candidates = ["日付", "宿泊日", "date"]
 
+    # 完全一致を優先し、部分一致は最初に見つかった列を控えておく
+    partial = None
     for key, original in normalized.items():
-        cleaned = re.sub(r"\s+", "", key)
-        if cleaned in candidates:
+        if WHITESPACE_RE.sub("", key) in DATE_COLUMN_NAMES:
             return original
+        if partial is None and (
+            DATE_LABEL_RE.search(key) or "宿泊日" in key or "date" in key
+        ):
+            partial = original
 
-    for key, original in normalized.items():
-        if re.search(r"日\s*付", key) or "宿泊日" in key or "date" in key:
-            return original
+    if partial is None:
+        raise KeyError("日付に該当する列が見つかりません")
+    return partial
+
+
+@lru_cache(maxsize=None)
+def holidays_in_year(year: int) -> np.ndarray:
+    """Return the Japanese public holidays of ``year`` as a ``datetime64[D]`` array.
+
+    ``jpholiday.is_holiday`` evaluates the holiday rules on every call, so the
+    whole year is resolved once and every month sheet reuses the same array.
+    """
+
+    return np.array(sorted(d for d, _ in jpholiday.year_holidays(year)), dtype="datetime64[D]")
+
+
+def ratio_formula_templates(room: str, pax: str, sales: str) -> dict[str, str]:
+    """Return ``{row}`` formula templates for OCC/ADR/DOR/RevPAR of one block.
 
-    raise KeyError("日付に該当する列が見つかりません")
+    ``room``, ``pax`` and ``sales`` are the column letters of a FC/OH/実績
+    block's manual input columns. Each ratio stays blank until the inputs it
+    depends on are filled in.
+    """
+
+    return {
+        "OCC": f"=IF({room}{{row}}=\"\", \"\", {room}{{row}}/{CAPACITY_NAME})",
+        "ADR": f"=IF(OR({sales}{{row}}=\"\", {room}{{row}}=\"\"), \"\", {sales}{{row}}/{room}{{row}})",
+        "DOR": f"=IF(OR({pax}{{row}}=\"\", {room}{{row}}=\"\"), \"\", {pax}{{row}}/{room}{{row}})",
+        "RevPAR": f"=IF({sales}{{row}}=\"\", \"\", {sales}{{row}}/{CAPACITY_NAME})",
+    }
+
+
+def styled_row(
+    ws, values: list, layout: list[tuple[str, Border | None]]
+) -> list[WriteOnlyCell]:
+    """Return write-only cells for ``values`` styled by a per-column ``layout``.
+
+    Each layout entry is a named style and an optional border that replaces
+    the style's border, so fill, border and number format are set while the
+    cell is created instead of in a later pass.
+    """
+
+    cells = []
+    for value, (style_name, border) in zip(values, layout):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style_name
+        if border is not None:
+            cell.border = border
+        cells.append(cell)
+    return cells
 
 # === GUIでキャパシティと期首月の取得 ===
 
@@ -58,685 +127,513 @@ except tk.TclError:
     capacity = int(input("キャパシティ（部屋数）: "))
     start_month = int(input("期首月 (1-12): "))
     file_path = input("日別予算Excelファイルのパス: ")
+# 年度の開始年はファイル名から一度だけ求め、年間集計と出力ファイル名で共有する
+match = YEAR_RE.search(file_path)
+start_year = int(match.group(1)) if match else datetime.date.today().year
+
 # === Excel読み込み ===
-xls = pd.read_excel(file_path, sheet_name=None)
+try:
+    excel_file = pd.ExcelFile(file_path, engine="calamine")
+except (ImportError, ValueError):
+    # python-calamine が無い、または calamine エンジン非対応の pandas (<2.2) では既定の openpyxl で読む
+    excel_file = pd.ExcelFile(file_path)
 
 # === 出力用Excel作成 ===
-wb = Workbook()
-wb.remove(wb.active)
+wb = Workbook(write_only=True)
+# 数式はキャパシティを直接埋め込まず名前で参照する（「名前の管理」から一括で変更できる）
+wb.defined_names[CAPACITY_NAME] = DefinedName(CAPACITY_NAME, attr_text=str(capacity))
 
 # === 曜日装飾 ===
 sat_fill = PatternFill(start_color="DDEEFF", end_color="DDEEFF", fill_type="solid")
 sat_font = Font(color="003366")
 sun_fill = PatternFill(start_color="FFE5E5", end_color="FFE5E5", fill_type="solid")
 sun_font = Font(color="990000")
+bold_font = Font(bold=True)
+neg_font = Font(color="FF0000")
 gray_fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
 budget_fill = PatternFill(start_color="E6F2FF", end_color="E6F2FF", fill_type="solid")
 fc_fill = PatternFill(start_color="E6FFE6", end_color="E6FFE6", fill_type="solid")
+diff_fill = PatternFill(start_color="FFFAD0", end_color="FFFAD0", fill_type="solid")
+no_fill = PatternFill()
+variance_budget_fill = PatternFill(start_color="DDEEFF", end_color="DDEEFF", fill_type="solid")
+variance_fc_fill = PatternFill(start_color="DDFFDD", end_color="DDFFDD", fill_type="solid")
+# === 指標ごとの表示形式 ===
+NUMBER_FORMATS = {
+    "室数": "#,##0",
+    "人数": "#,##0",
+    "宿泊売上": "#,##0",
+    "OCC": "0.0%",
+    "ADR": "#,##0",
+    "DOR": "0.00",
+    "RevPAR": "#,##0",
+}
 thin = Side(style="thin", color="999999")
 medium = Side(style="medium", color="999999")
 
-# --- 各月シート作成 ---
-summary_dict: dict[tuple[int, int], dict[str, int]] = {}
-for sheet_name, df in xls.items():
-    if not isinstance(df, pd.DataFrame) or df.empty:
-        continue
-
-    try:
-        date_col = find_date_column(df)
-    except KeyError:
-        continue
-    df["日付"] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.dropna(subset=["日付"]).sort_values("日付")
-    if df.empty:
-        continue
-
-    year = int(df["日付"].dt.year.iloc[0])
-    month = int(df["日付"].dt.month.iloc[0])
-    ws = wb.create_sheet(title=f"{year}年{month}月")
-
-    # 日付ごとに横持ち化
-    metrics = ["室数", "人数", "宿泊売上", "OCC", "ADR", "DOR", "RevPAR"]
-    rows: list[dict] = []
-    for _, r in df.iterrows():
-        date = r["日付"].date()
-        weekday_jp = ["月", "火", "水", "木", "金", "土", "日"][date.weekday()]
-        if jpholiday.is_holiday(date):
-            weekday_jp = f"{weekday_jp}・祝"
-
-        base = {
-            "日付": date.strftime("%Y/%m/%d"),
-            "曜日": weekday_jp,
-            "室数_予算": r.get("室数", ""),
-            "人数_予算": r.get("人数", ""),
-            "宿泊売上_予算": r.get("宿泊売上", ""),
-        }
-        for m in ["OCC", "ADR", "DOR", "RevPAR"]:
-            base[f"{m}_予算"] = ""
-        for kind in ["FC", "OH", "実績"]:
-            for m in metrics:
-                base[f"{m}_{kind}"] = ""
-        rows.append(base)
-
-    df_out = pd.DataFrame(rows)
-
-    # 列順を定義
-    metrics = ["室数", "人数", "宿泊売上", "OCC", "ADR", "DOR", "RevPAR"]
-    cols = ["日付", "曜日"]
-    cols += [f"{m}_予算" for m in metrics]
-    cols += [f"{m}_FC" for m in metrics]
-    cols += ["差_OCC_FC-予算", "差_ADR_FC-予算", "差_売上_FC-予算"]
-    cols += [f"{m}_OH" for m in metrics]
-    cols += ["差_OCC_OH-FC", "差_ADR_OH-FC", "差_売上_OH-FC"]
-    cols += [f"{m}_実績" for m in metrics]
-    cols += ["差_OCC_実績-FC", "差_ADR_実績-FC", "差_売上_実績-FC"]
-    for c in cols:
-        if c not in df_out.columns:
-            df_out[c] = ""
-    df_out = df_out.reindex(columns=cols)
-
-    # 出力
-    for r in dataframe_to_rows(df_out, index=False, header=True):
-        ws.append(r)
-
-    header_map = {c.value: i for i, c in enumerate(ws[1], start=1)}
-    ws.freeze_panes = "C2"
-    data_end_row = ws.max_row
-    for row in range(2, data_end_row + 1):
-        # 予算列の指標をExcel数式で計算
-        room_c = get_column_letter(header_map["室数_予算"])
-        pax_c = get_column_letter(header_map["人数_予算"])
-        sales_c = get_column_letter(header_map["宿泊売上_予算"])
-        occ_c = ws.cell(row=row, column=header_map["OCC_予算"])
-        adr_c = ws.cell(row=row, column=header_map["ADR_予算"])
-        dor_c = ws.cell(row=row, column=header_map["DOR_予算"])
-        rev_c = ws.cell(row=row, column=header_map["RevPAR_予算"])
-
-        occ_c.value = f"={room_c}{row}/{capacity}"
-        adr_c.value = f"={sales_c}{row}/{room_c}{row}"
-        dor_c.value = f"={pax_c}{row}/{room_c}{row}"
-        rev_c.value = f"={sales_c}{row}/{capacity}"
-
-        occ_c.number_format = "0.0%"
-        adr_c.number_format = "#,##0"
-        dor_c.number_format = "0.00"
-        rev_c.number_format = "#,##0"
-        for col_name in ["室数_予算", "人数_予算", "宿泊売上_予算"]:
-            ws.cell(row=row, column=header_map[col_name]).number_format = "#,##0"
-
-        # FC列の数式
-        fc_room_c = get_column_letter(header_map["室数_FC"])
-        fc_pax_c = get_column_letter(header_map["人数_FC"])
-        fc_sales_c = get_column_letter(header_map["宿泊売上_FC"])
-        fc_occ = ws.cell(row=row, column=header_map["OCC_FC"])
-        fc_adr = ws.cell(row=row, column=header_map["ADR_FC"])
-        fc_dor = ws.cell(row=row, column=header_map["DOR_FC"])
-        fc_rev = ws.cell(row=row, column=header_map["RevPAR_FC"])
-
-        fc_occ.value = (
-            f"=IF({fc_room_c}{row}=\"\", \"\", {fc_room_c}{row}/{capacity})"
-        )
-        fc_adr.value = (
-            f"=IF(OR({fc_sales_c}{row}=\"\", {fc_room_c}{row}=\"\"), \"\", {fc_sales_c}{row}/{fc_room_c}{row})"
-        )
-        fc_dor.value = (
-            f"=IF(OR({fc_pax_c}{row}=\"\", {fc_room_c}{row}=\"\"), \"\", {fc_pax_c}{row}/{fc_room_c}{row})"
-        )
-        fc_rev.value = (
-            f"=IF({fc_sales_c}{row}=\"\", \"\", {fc_sales_c}{row}/{capacity})"
-        )
-
-        fc_occ.number_format = "0.0%"
-        fc_adr.number_format = "#,##0"
-        fc_dor.number_format = "0.00"
-        fc_rev.number_format = "#,##0"
-
-        # OH列の数式
-        oh_room_c = get_column_letter(header_map["室数_OH"])
-        oh_pax_c = get_column_letter(header_map["人数_OH"])
-        oh_sales_c = get_column_letter(header_map["宿泊売上_OH"])
-        oh_occ = ws.cell(row=row, column=header_map["OCC_OH"])
-        oh_adr = ws.cell(row=row, column=header_map["ADR_OH"])
-        oh_dor = ws.cell(row=row, column=header_map["DOR_OH"])
-        oh_rev = ws.cell(row=row, column=header_map["RevPAR_OH"])
-
-        oh_occ.value = (
-            f"=IF({oh_room_c}{row}=\"\", \"\", {oh_room_c}{row}/{capacity})"
-        )
-        oh_adr.value = (
-            f"=IF(OR({oh_sales_c}{row}=\"\", {oh_room_c}{row}=\"\"), \"\", {oh_sales_c}{row}/{oh_room_c}{row})"
-        )
-        oh_dor.value = (
-            f"=IF(OR({oh_pax_c}{row}=\"\", {oh_room_c}{row}=\"\"), \"\", {oh_pax_c}{row}/{oh_room_c}{row})"
-        )
-        oh_rev.value = (
-            f"=IF({oh_sales_c}{row}=\"\", \"\", {oh_sales_c}{row}/{capacity})"
-        )
-
-        oh_occ.number_format = "0.0%"
-        oh_adr.number_format = "#,##0"
-        oh_dor.number_format = "0.00"
-        oh_rev.number_format = "#,##0"
-
-        # 実績列の数式
-        act_room_c = get_column_letter(header_map["室数_実績"])
-        act_pax_c = get_column_letter(header_map["人数_実績"])
-        act_sales_c = get_column_letter(header_map["宿泊売上_実績"])
-        act_occ = ws.cell(row=row, column=header_map["OCC_実績"])
-        act_adr = ws.cell(row=row, column=header_map["ADR_実績"])
-        act_dor = ws.cell(row=row, column=header_map["DOR_実績"])
-        act_rev = ws.cell(row=row, column=header_map["RevPAR_実績"])
-
-        act_occ.value = (
-            f"=IF({act_room_c}{row}=\"\", \"\", {act_room_c}{row}/{capacity})"
-        )
-        act_adr.value = (
-            f"=IF(OR({act_sales_c}{row}=\"\", {act_room_c}{row}=\"\"), \"\", {act_sales_c}{row}/{act_room_c}{row})"
-        )
-        act_dor.value = (
-            f"=IF(OR({act_pax_c}{row}=\"\", {act_room_c}{row}=\"\"), \"\", {act_pax_c}{row}/{act_room_c}{row})"
-        )
-        act_rev.value = (
-            f"=IF({act_sales_c}{row}=\"\", \"\", {act_sales_c}{row}/{capacity})"
+# === 罫線 ===
+# (上下が太線の行か, 右端が太線の列か) で月シートのセル罫線が決まる
+month_borders = {
+    (False, False): Border(top=thin, bottom=thin, left=thin, right=thin),
+    (False, True): Border(top=thin, bottom=thin, left=thin, right=medium),
+    (True, False): Border(top=medium, bottom=medium, left=thin, right=thin),
+    (True, True): Border(top=medium, bottom=medium, left=thin, right=medium),
+}
+# 年間シートの表ブロックは先頭行の上辺・最終行の下辺を太線にする
+block_edge_borders = {
+    "top": Border(top=medium, bottom=thin, left=thin, right=thin),
+    "bottom": Border(top=thin, bottom=medium, left=thin, right=thin),
+}
+
+# === 共通スタイル ===
+for style_name, font, fill, border, number_format in [
+    ("thin_box", DEFAULT_FONT, no_fill, month_borders[(False, False)], "General"),
+    ("header_style", bold_font, no_fill, month_borders[(True, False)], "General"),
+    ("sat_style", sat_font, sat_fill, month_borders[(False, False)], "General"),
+    ("sun_style", sun_font, sun_fill, month_borders[(False, False)], "General"),
+    ("diff_pct_style", DEFAULT_FONT, diff_fill, month_borders[(False, False)], NUMBER_FORMATS["OCC"]),
+    ("diff_int_style", DEFAULT_FONT, diff_fill, month_borders[(False, False)], NUMBER_FORMATS["宿泊売上"]),
+] + [
+    # 月シートの指標列: 区分(背景色) × 指標(表示形式)
+    (f"{prefix}_{metric}", DEFAULT_FONT, fill, month_borders[(False, False)], number_format)
+    for prefix, fill in [("budget", budget_fill), ("fc", fc_fill), ("oh", no_fill), ("act", no_fill)]
+    for metric, number_format in NUMBER_FORMATS.items()
+]:
+    wb.add_named_style(
+        NamedStyle(
+            name=style_name,
+            font=font,
+            fill=fill,
+            border=border,
+            number_format=number_format,
         )
+    )
 
-        act_occ.number_format = "0.0%"
-        act_adr.number_format = "#,##0"
-        act_dor.number_format = "0.00"
-        act_rev.number_format = "#,##0"
-
-        # 手入力セルの表示形式
-        for col_name in [
-            "室数_FC",
-            "人数_FC",
-            "宿泊売上_FC",
-            "室数_OH",
-            "人数_OH",
-            "宿泊売上_OH",
-            "室数_実績",
-            "人数_実績",
-            "宿泊売上_実績",
-        ]:
-            ws.cell(row=row, column=header_map[col_name]).number_format = "#,##0"
-
-        # 差異列
-        ws.cell(row=row, column=header_map["差_OCC_FC-予算"]).value = (
-            f"=IF({get_column_letter(header_map['OCC_FC'])}{row}=\"\", \"\", {get_column_letter(header_map['OCC_FC'])}{row}-{get_column_letter(header_map['OCC_予算'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_ADR_FC-予算"]).value = (
-            f"=IF({get_column_letter(header_map['ADR_FC'])}{row}=\"\", \"\", {get_column_letter(header_map['ADR_FC'])}{row}-{get_column_letter(header_map['ADR_予算'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_売上_FC-予算"]).value = (
-            f"=IF({get_column_letter(header_map['宿泊売上_FC'])}{row}=\"\", \"\", {get_column_letter(header_map['宿泊売上_FC'])}{row}-{get_column_letter(header_map['宿泊売上_予算'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_OCC_OH-FC"]).value = (
-            f"=IF({get_column_letter(header_map['OCC_OH'])}{row}=\"\", \"\", {get_column_letter(header_map['OCC_OH'])}{row}-{get_column_letter(header_map['OCC_FC'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_ADR_OH-FC"]).value = (
-            f"=IF({get_column_letter(header_map['ADR_OH'])}{row}=\"\", \"\", {get_column_letter(header_map['ADR_OH'])}{row}-{get_column_letter(header_map['ADR_FC'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_売上_OH-FC"]).value = (
-            f"=IF({get_column_letter(header_map['宿泊売上_OH'])}{row}=\"\", \"\", {get_column_letter(header_map['宿泊売上_OH'])}{row}-{get_column_letter(header_map['宿泊売上_FC'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_OCC_実績-FC"]).value = (
-            f"=IF({get_column_letter(header_map['OCC_実績'])}{row}=\"\", \"\", {get_column_letter(header_map['OCC_実績'])}{row}-{get_column_letter(header_map['OCC_FC'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_ADR_実績-FC"]).value = (
-            f"=IF({get_column_letter(header_map['ADR_実績'])}{row}=\"\", \"\", {get_column_letter(header_map['ADR_実績'])}{row}-{get_column_letter(header_map['ADR_FC'])}{row})"
-        )
-        ws.cell(row=row, column=header_map["差_売上_実績-FC"]).value = (
-            f"=IF({get_column_letter(header_map['宿泊売上_実績'])}{row}=\"\", \"\", {get_column_letter(header_map['宿泊売上_実績'])}{row}-{get_column_letter(header_map['宿泊売上_FC'])}{row})"
-        )
+# === 曜日ラベル ===
+WEEKDAY_LABELS = ("月", "火", "水", "木", "金", "土", "日")
+HOLIDAY_LABELS = tuple(f"{w}・祝" for w in WEEKDAY_LABELS)
+# [祝日か][曜日番号] で表示ラベルを引く 2×7 の表
+WEEKDAY_LABEL_TABLE = np.array([WEEKDAY_LABELS, HOLIDAY_LABELS], dtype=object)
+
+# === 月シートの列構成（全月共通） ===
+KINDS = ("予算", "FC", "OH", "実績")
+ALL_METRICS = ("室数", "人数", "宿泊売上", "OCC", "ADR", "DOR", "RevPAR")
+# 手入力・合計の対象になる実数の指標
+BASE_METRICS = ("室数", "人数", "宿泊売上")
+DIFF_SPECS = [
+    ("差_OCC_FC-予算", "OCC_FC", "OCC_予算"),
+    ("差_ADR_FC-予算", "ADR_FC", "ADR_予算"),
+    ("差_売上_FC-予算", "宿泊売上_FC", "宿泊売上_予算"),
+    ("差_OCC_OH-FC", "OCC_OH", "OCC_FC"),
+    ("差_ADR_OH-FC", "ADR_OH", "ADR_FC"),
+    ("差_売上_OH-FC", "宿泊売上_OH", "宿泊売上_FC"),
+    ("差_OCC_実績-FC", "OCC_実績", "OCC_FC"),
+    ("差_ADR_実績-FC", "ADR_実績", "ADR_FC"),
+    ("差_売上_実績-FC", "宿泊売上_実績", "宿泊売上_FC"),
+]
+DIFF_NAMES = [diff_col for diff_col, _, _ in DIFF_SPECS]
+COLS = ["日付", "曜日"]
+COLS += [f"{m}_予算" for m in ALL_METRICS]
+COLS += [f"{m}_FC" for m in ALL_METRICS]
+COLS += DIFF_NAMES[0:3]
+COLS += [f"{m}_OH" for m in ALL_METRICS]
+COLS += DIFF_NAMES[3:6]
+COLS += [f"{m}_実績" for m in ALL_METRICS]
+COLS += DIFF_NAMES[6:9]
+HEADER_MAP = {name: idx for idx, name in enumerate(COLS, start=1)}
+COL_LETTERS = {name: get_column_letter(idx) for name, idx in HEADER_MAP.items()}
+
+STYLE_BY_COL: dict[int, str] = {}
+for kind, prefix in [("予算", "budget"), ("FC", "fc"), ("OH", "oh"), ("実績", "act")]:
+    for m in ALL_METRICS:
+        STYLE_BY_COL[HEADER_MAP[f"{m}_{kind}"]] = f"{prefix}_{m}"
+for diff_col in DIFF_NAMES:
+    STYLE_BY_COL[HEADER_MAP[diff_col]] = (
+        "diff_pct_style" if diff_col.startswith("差_OCC") else "diff_int_style"
+    )
+BLOCK_ENDS = {HEADER_MAP[f"RevPAR_{kind}"] for kind in KINDS}
+# 行の種類ごとの (名前付きスタイル, 差し替える罫線) を列順に並べたもの
+# 見出し行・合計行・修正フォーキャスト行は上下が太線、各区分の右端列は右辺が太線
+MONTH_ROW_LAYOUTS: dict[str, list[tuple[str, Border | None]]] = {
+    "header": [
+        ("header_style", month_borders[(True, True)] if col in BLOCK_ENDS else None)
+        for col in range(1, len(COLS) + 1)
+    ],
+    "body": [
+        (STYLE_BY_COL.get(col, "thin_box"), month_borders[(False, True)] if col in BLOCK_ENDS else None)
+        for col in range(1, len(COLS) + 1)
+    ],
+    "edge": [
+        (STYLE_BY_COL.get(col, "thin_box"), month_borders[(True, col in BLOCK_ENDS)])
+        for col in range(1, len(COLS) + 1)
+    ],
+}
+# 土曜・日祝の明細行は曜日セルだけ色付きスタイルに差し替える
+for day_kind in ["sat", "sun"]:
+    MONTH_ROW_LAYOUTS[f"body_{day_kind}"] = list(MONTH_ROW_LAYOUTS["body"])
+    MONTH_ROW_LAYOUTS[f"body_{day_kind}"][HEADER_MAP["曜日"] - 1] = (f"{day_kind}_style", None)
+
+# 明細行で入力データを置く列（それ以外は空欄か数式）
+ROW_INPUT_COLS = [HEADER_MAP[c] for c in ["日付", "曜日", "室数_予算", "人数_予算", "宿泊売上_予算"]]
+
+# 行ごとの数式テンプレート（行番号以外は全月・全行で不変）
+room_c = COL_LETTERS["室数_予算"]
+pax_c = COL_LETTERS["人数_予算"]
+sales_c = COL_LETTERS["宿泊売上_予算"]
+row_templates = [
+    (HEADER_MAP["OCC_予算"], f"={room_c}{{row}}/{CAPACITY_NAME}"),
+    (HEADER_MAP["ADR_予算"], f"={sales_c}{{row}}/{room_c}{{row}}"),
+    (HEADER_MAP["DOR_予算"], f"={pax_c}{{row}}/{room_c}{{row}}"),
+    (HEADER_MAP["RevPAR_予算"], f"={sales_c}{{row}}/{CAPACITY_NAME}"),
+]
+for kind in ["FC", "OH", "実績"]:
+    templates = ratio_formula_templates(
+        COL_LETTERS[f"室数_{kind}"],
+        COL_LETTERS[f"人数_{kind}"],
+        COL_LETTERS[f"宿泊売上_{kind}"],
+    )
+    row_templates += [(HEADER_MAP[f"{m}_{kind}"], t) for m, t in templates.items()]
+row_templates += [
+    (
+        HEADER_MAP[diff_col],
+        f"=IF({COL_LETTERS[l]}{{row}}=\"\", \"\", {COL_LETTERS[l]}{{row}}-{COL_LETTERS[r]}{{row}})",
+    )
+    for diff_col, l, r in DIFF_SPECS
+]
 
-        for diff_col in ["差_OCC_FC-予算", "差_OCC_OH-FC", "差_OCC_実績-FC"]:
-            ws.cell(row=row, column=header_map[diff_col]).number_format = "0.0%"
-        for diff_col in ["差_ADR_FC-予算", "差_ADR_OH-FC", "差_ADR_実績-FC"]:
-            ws.cell(row=row, column=header_map[diff_col]).number_format = "#,##0"
-        for diff_col in ["差_売上_FC-予算", "差_売上_OH-FC", "差_売上_実績-FC"]:
-            ws.cell(row=row, column=header_map[diff_col]).number_format = "#,##0"
-        for diff_col in [
-            "差_OCC_FC-予算",
-            "差_OCC_OH-FC",
-            "差_ADR_FC-予算",
-            "差_ADR_OH-FC",
-            "差_売上_FC-予算",
-            "差_売上_OH-FC",
-            "差_OCC_実績-FC",
-            "差_ADR_実績-FC",
-            "差_売上_実績-FC",
-        ]:
-            ws.cell(row=row, column=header_map[diff_col]).fill = PatternFill(
-                start_color="FFFAD0",
-                end_color="FFFAD0",
-                fill_type="solid",
-            )
+# --- 各月シート作成 ---
+summary_dict: dict[tuple[int, int], SheetInfo] = {}
+with excel_file:
+    # シートは月シート作成ループで1枚ずつ読み込み、全シート分のDataFrameを同時に保持しない
+    xls = ((name, excel_file.parse(name)) for name in excel_file.sheet_names)
+    for sheet_name, df in xls:
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            continue
 
-        # 曜日装飾
-        w_cell = ws.cell(row=row, column=header_map["曜日"])
-        date_cell = ws.cell(row=row, column=header_map["日付"])
         try:
-            d_obj = datetime.datetime.strptime(str(date_cell.value), "%Y/%m/%d").date()
-        except Exception:
+            date_col = find_date_column(df)
+        except KeyError:
             continue
-        if jpholiday.is_holiday(d_obj) or w_cell.value in ["日", "祝"]:
-            w_cell.fill = sun_fill
-            w_cell.font = sun_font
-        elif w_cell.value == "土":
-            w_cell.fill = sat_fill
-            w_cell.font = sat_font
-
-    # 実績入力時にFC列とOH列をグレー化
-    actual_col = get_column_letter(header_map["室数_実績"])
-    formula = f"LEN(${actual_col}2)>0"
-    for offset in range(0, 7):
-        col_letter = get_column_letter(header_map["室数_FC"] + offset)
-        rule = FormulaRule(formula=[formula], fill=gray_fill)
-        ws.conditional_formatting.add(
-            f"{col_letter}2:{col_letter}{data_end_row}", rule
+        df["日付"] = pd.to_datetime(df[date_col], errors="coerce")
+        df = df.dropna(subset=["日付"]).sort_values("日付")
+        if df.empty:
+            continue
+        df = df.reindex(
+            columns=list(df.columns) + [c for c in BASE_METRICS if c not in df.columns],
+            fill_value="",
+        )
+
+        year = int(df["日付"].dt.year.iloc[0])
+        month = int(df["日付"].dt.month.iloc[0])
+        ws = wb.create_sheet(title=f"{year}年{month}月")
+
+        # 日付ごとに横持ち化
+        dates = df["日付"]
+        holidays = np.concatenate([holidays_in_year(int(y)) for y in dates.dt.year.unique()])
+        is_holiday = np.isin(dates.to_numpy(dtype="datetime64[D]"), holidays)
+        weekdays = dates.dt.weekday.to_numpy()
+        weekday_jp = WEEKDAY_LABEL_TABLE[is_holiday.astype(np.intp), weekdays]
+        # 明細行ごとのレイアウト名（日祝 > 土 > 平日）
+        row_layouts = np.where(
+            is_holiday | (weekdays == 6), "body_sun", np.where(weekdays == 5, "body_sat", "body")
+        )
+        # 行ごとの入力値（ROW_INPUT_COLS の順）
+        row_inputs = zip(
+            dates.dt.strftime("%Y/%m/%d").tolist(),
+            weekday_jp.tolist(),
+            df["室数"].tolist(),
+            df["人数"].tolist(),
+            df["宿泊売上"].tolist(),
+        )
+
+        # 出力（書き込み専用シートのため、全行を組み立ててからまとめて追記）
+        ws.freeze_panes = "C2"
+        # 予算・FC・OH・実績の指標と差異列のExcel数式は、セル化する前に行の値リストへ埋め込む
+        # 背景色・罫線・表示形式はセル生成時に行の種類ごとのレイアウトで設定する
+        grid = [styled_row(ws, COLS, MONTH_ROW_LAYOUTS["header"])]
+        for row, inputs, layout in zip(range(2, len(df) + 2), row_inputs, row_layouts):
+            values = [""] * len(COLS)
+            for col, value in zip(ROW_INPUT_COLS, inputs):
+                values[col - 1] = value
+            for col, template in row_templates:
+                values[col - 1] = template.format(row=row)
+            grid.append(styled_row(ws, values, MONTH_ROW_LAYOUTS[layout]))
+        data_end_row = len(grid)
+        total_row = data_end_row + 1
+        forecast_row = total_row + 1
+
+        # 実績入力時にFC列とOH列をグレー化（両ブロックを1つのルールで対象にする）
+        actual_col = COL_LETTERS["室数_実績"]
+        gray_ranges = " ".join(
+            f"{COL_LETTERS[f'室数_{kind}']}2:{COL_LETTERS[f'RevPAR_{kind}']}{data_end_row}"
+            for kind in ["FC", "OH"]
         )
-    for offset in range(0, 7):
-        col_letter = get_column_letter(header_map["室数_OH"] + offset)
-        rule = FormulaRule(formula=[formula], fill=gray_fill)
         ws.conditional_formatting.add(
-            f"{col_letter}2:{col_letter}{data_end_row}", rule
-        )
-
-    # 合計行
-    total_row = data_end_row + 1
-    days_count = data_end_row - 1
-    ws.cell(row=total_row, column=1, value="合計")
-    for kind in ["予算", "FC", "OH", "実績"]:
-        r_col = header_map[f"室数_{kind}"]
-        p_col = header_map[f"人数_{kind}"]
-        s_col = header_map[f"宿泊売上_{kind}"]
-        occ_col = header_map[f"OCC_{kind}"]
-        adr_col = header_map[f"ADR_{kind}"]
-        dor_col = header_map[f"DOR_{kind}"]
-        rev_col = header_map[f"RevPAR_{kind}"]
-        rl = get_column_letter(r_col)
-        pl = get_column_letter(p_col)
-        sl = get_column_letter(s_col)
-        if kind == "OH":
-            act_r = get_column_letter(header_map["室数_実績"])
-            act_p = get_column_letter(header_map["人数_実績"])
-            act_s = get_column_letter(header_map["宿泊売上_実績"])
-            ws.cell(row=total_row, column=r_col).value = (
-                f"=SUM({act_r}2:{act_r}{data_end_row})+SUMIFS({rl}2:{rl}{data_end_row},{act_r}2:{act_r}{data_end_row},\"\")"
+            gray_ranges, FormulaRule(formula=[f"LEN(${actual_col}2)>0"], fill=gray_fill)
+        )
+
+        # 合計行・修正月次フォーキャスト行（値を並べてからセル化）
+        days_count = data_end_row - 1
+        total_values: list[str | None] = [None] * len(COLS)
+        forecast_values: list[str | None] = [None] * len(COLS)
+        total_values[0] = "合計"
+        for kind in KINDS:
+            r_col = HEADER_MAP[f"室数_{kind}"]
+            p_col = HEADER_MAP[f"人数_{kind}"]
+            s_col = HEADER_MAP[f"宿泊売上_{kind}"]
+            occ_col = HEADER_MAP[f"OCC_{kind}"]
+            adr_col = HEADER_MAP[f"ADR_{kind}"]
+            dor_col = HEADER_MAP[f"DOR_{kind}"]
+            rev_col = HEADER_MAP[f"RevPAR_{kind}"]
+            rl = COL_LETTERS[f"室数_{kind}"]
+            pl = COL_LETTERS[f"人数_{kind}"]
+            sl = COL_LETTERS[f"宿泊売上_{kind}"]
+            if kind == "OH":
+                act_r = COL_LETTERS["室数_実績"]
+                act_p = COL_LETTERS["人数_実績"]
+                act_s = COL_LETTERS["宿泊売上_実績"]
+                total_values[r_col - 1] = (
+                    f"=SUM({act_r}2:{act_r}{data_end_row})+SUMIFS({rl}2:{rl}{data_end_row},{act_r}2:{act_r}{data_end_row},\"\")"
+                )
+                total_values[p_col - 1] = (
+                    f"=SUM({act_p}2:{act_p}{data_end_row})+SUMIFS({pl}2:{pl}{data_end_row},{act_p}2:{act_p}{data_end_row},\"\")"
+                )
+                total_values[s_col - 1] = (
+                    f"=SUM({act_s}2:{act_s}{data_end_row})+SUMIFS({sl}2:{sl}{data_end_row},{act_s}2:{act_s}{data_end_row},\"\")"
+                )
+            else:
+                total_values[r_col - 1] = f"=SUM({rl}2:{rl}{data_end_row})"
+                total_values[p_col - 1] = f"=SUM({pl}2:{pl}{data_end_row})"
+                total_values[s_col - 1] = f"=SUM({sl}2:{sl}{data_end_row})"
+            # OH以外は室数の合計セルがそのまま列の SUM なので再集計せず参照する
+            room_sum = f"SUM({rl}2:{rl}{data_end_row})" if kind == "OH" else f"{rl}{total_row}"
+            total_values[occ_col - 1] = (
+                f"=IF(COUNT({rl}2:{rl}{data_end_row})=0, \"\", {room_sum}/{CAPACITY_NAME}/COUNT({rl}2:{rl}{data_end_row}))"
             )
-            ws.cell(row=total_row, column=p_col).value = (
-                f"=SUM({act_p}2:{act_p}{data_end_row})+SUMIFS({pl}2:{pl}{data_end_row},{act_p}2:{act_p}{data_end_row},\"\")"
+            total_values[adr_col - 1] = (
+                f"=IF(COUNT({sl}2:{sl}{data_end_row})=0, \"\", {sl}{total_row}/{rl}{total_row})"
             )
-            ws.cell(row=total_row, column=s_col).value = (
-                f"=SUM({act_s}2:{act_s}{data_end_row})+SUMIFS({sl}2:{sl}{data_end_row},{act_s}2:{act_s}{data_end_row},\"\")"
+            total_values[dor_col - 1] = (
+                f"=IF(COUNT({pl}2:{pl}{data_end_row})=0, \"\", {pl}{total_row}/{rl}{total_row})"
             )
-        else:
-            ws.cell(row=total_row, column=r_col).value = f"=SUM({rl}2:{rl}{data_end_row})"
-            ws.cell(row=total_row, column=p_col).value = f"=SUM({pl}2:{pl}{data_end_row})"
-            ws.cell(row=total_row, column=s_col).value = f"=SUM({sl}2:{sl}{data_end_row})"
-        ws.cell(row=total_row, column=occ_col).value = (
-            f"=IF(COUNT({rl}2:{rl}{data_end_row})=0, \"\", SUM({rl}2:{rl}{data_end_row})/{capacity}/COUNT({rl}2:{rl}{data_end_row}))"
-        )
-        ws.cell(row=total_row, column=adr_col).value = (
-            f"=IF(COUNT({sl}2:{sl}{data_end_row})=0, \"\", {sl}{total_row}/{rl}{total_row})"
-        )
-        ws.cell(row=total_row, column=dor_col).value = (
-            f"=IF(COUNT({pl}2:{pl}{data_end_row})=0, \"\", {pl}{total_row}/{rl}{total_row})"
-        )
-        ws.cell(row=total_row, column=rev_col).value = (
-            f"=IF(COUNT({sl}2:{sl}{data_end_row})=0, \"\", {sl}{total_row}/{capacity}/{days_count})"
-        )
-        for col in [r_col, p_col, s_col, occ_col, adr_col, dor_col, rev_col]:
-            ws.cell(row=total_row, column=col).number_format = ws.cell(row=2, column=col).number_format
-
-    for diff_col, l, r in [
-        ("差_OCC_FC-予算", "OCC_FC", "OCC_予算"),
-        ("差_ADR_FC-予算", "ADR_FC", "ADR_予算"),
-        ("差_売上_FC-予算", "宿泊売上_FC", "宿泊売上_予算"),
-        ("差_OCC_OH-FC", "OCC_OH", "OCC_FC"),
-        ("差_ADR_OH-FC", "ADR_OH", "ADR_FC"),
-        ("差_売上_OH-FC", "宿泊売上_OH", "宿泊売上_FC"),
-        ("差_OCC_実績-FC", "OCC_実績", "OCC_FC"),
-        ("差_ADR_実績-FC", "ADR_実績", "ADR_FC"),
-        ("差_売上_実績-FC", "宿泊売上_実績", "宿泊売上_FC"),
-    ]:
-        left_col = header_map[l]
-        right_col = header_map[r]
-        ltr = get_column_letter(left_col)
-        rtr = get_column_letter(right_col)
-        if diff_col in ["差_売上_FC-予算", "差_売上_実績-FC"]:
-            range_left = f"{ltr}2:{ltr}{data_end_row}"
-            range_right = f"{rtr}2:{rtr}{data_end_row}"
-            ws.cell(row=total_row, column=header_map[diff_col]).value = (
-                f"=IF(COUNT({range_left})=0, \"\", SUMIF({range_left}, \"<>\", {range_left})-SUMIF({range_left}, \"<>\", {range_right}))"
+            total_values[rev_col - 1] = (
+                f"=IF(COUNT({sl}2:{sl}{data_end_row})=0, \"\", {sl}{total_row}/{CAPACITY_NAME}/{days_count})"
             )
-        else:
-            ws.cell(row=total_row, column=header_map[diff_col]).value = (
-                f"=IF({ltr}{total_row}=\"\", \"\", {ltr}{total_row}-{rtr}{total_row})"
+
+        for diff_col, l, r in DIFF_SPECS:
+            ltr = COL_LETTERS[l]
+            rtr = COL_LETTERS[r]
+            if diff_col in ["差_売上_FC-予算", "差_売上_実績-FC"]:
+                range_left = f"{ltr}2:{ltr}{data_end_row}"
+                range_right = f"{rtr}2:{rtr}{data_end_row}"
+                total_values[HEADER_MAP[diff_col] - 1] = (
+                    f"=IF(COUNT({range_left})=0, \"\", {ltr}{total_row}-SUMIF({range_left}, \"<>\", {range_right}))"
+                )
+            else:
+                total_values[HEADER_MAP[diff_col] - 1] = (
+                    f"=IF({ltr}{total_row}=\"\", \"\", {ltr}{total_row}-{rtr}{total_row})"
+                )
+        # 修正月次フォーキャスト
+        forecast_values[0] = "修正月次フォーキャスト"
+        for m in BASE_METRICS:
+            fc_col = HEADER_MAP[f"{m}_FC"]
+            fc_letter = COL_LETTERS[f"{m}_FC"]
+            act_letter = COL_LETTERS[f"{m}_実績"]
+            forecast_values[fc_col - 1] = (
+                f"=SUM({act_letter}2:{act_letter}{data_end_row})+SUMIFS({fc_letter}2:{fc_letter}{data_end_row},{act_letter}2:{act_letter}{data_end_row},\"\")"
             )
-        ws.cell(row=total_row, column=header_map[diff_col]).number_format = ws.cell(row=2, column=header_map[diff_col]).number_format
-        ws.cell(row=total_row, column=header_map[diff_col]).fill = PatternFill(
-            start_color="FFFAD0",
-            end_color="FFFAD0",
-            fill_type="solid",
+
+        forecast_values[HEADER_MAP["OCC_FC"] - 1] = (
+            f"=IF({COL_LETTERS['室数_FC']}{forecast_row}=\"\", \"\", {COL_LETTERS['室数_FC']}{forecast_row}/({CAPACITY_NAME}*{days_count}))"
         )
-    # 修正月次フォーキャスト
-    forecast_row = total_row + 1
-    ws.cell(row=forecast_row, column=1, value="修正月次フォーキャスト")
-    metrics = ["室数", "人数", "宿泊売上"]
-    for m in metrics:
-        fc_col = header_map[f"{m}_FC"]
-        act_col = header_map[f"{m}_実績"]
-        fc_letter = get_column_letter(fc_col)
-        act_letter = get_column_letter(act_col)
-        cell = ws.cell(row=forecast_row, column=fc_col)
-        cell.value = (
-            f"=SUM({act_letter}2:{act_letter}{data_end_row})+SUMIFS({fc_letter}2:{fc_letter}{data_end_row},{act_letter}2:{act_letter}{data_end_row},\"\")"
+        forecast_values[HEADER_MAP["ADR_FC"] - 1] = (
+            f"=IF(OR({COL_LETTERS['宿泊売上_FC']}{forecast_row}=\"\", {COL_LETTERS['室数_FC']}{forecast_row}=\"\"), \"\", {COL_LETTERS['宿泊売上_FC']}{forecast_row}/{COL_LETTERS['室数_FC']}{forecast_row})"
         )
-        cell.number_format = ws.cell(row=2, column=fc_col).number_format
-
-    days_count = data_end_row - 1
-    ws.cell(row=forecast_row, column=header_map["OCC_FC"]).value = (
-        f"=IF({get_column_letter(header_map['室数_FC'])}{forecast_row}=\"\", \"\", {get_column_letter(header_map['室数_FC'])}{forecast_row}/({capacity}*{days_count}))"
-    )
-    ws.cell(row=forecast_row, column=header_map["ADR_FC"]).value = (
-        f"=IF(OR({get_column_letter(header_map['宿泊売上_FC'])}{forecast_row}=\"\", {get_column_letter(header_map['室数_FC'])}{forecast_row}=\"\"), \"\", {get_column_letter(header_map['宿泊売上_FC'])}{forecast_row}/{get_column_letter(header_map['室数_FC'])}{forecast_row})"
-    )
-    ws.cell(row=forecast_row, column=header_map["DOR_FC"]).value = (
-        f"=IF(OR({get_column_letter(header_map['人数_FC'])}{forecast_row}=\"\", {get_column_letter(header_map['室数_FC'])}{forecast_row}=\"\"), \"\", {get_column_letter(header_map['人数_FC'])}{forecast_row}/{get_column_letter(header_map['室数_FC'])}{forecast_row})"
-    )
-    ws.cell(row=forecast_row, column=header_map["RevPAR_FC"]).value = (
-        f"=IF({get_column_letter(header_map['宿泊売上_FC'])}{forecast_row}=\"\", \"\", {get_column_letter(header_map['宿泊売上_FC'])}{forecast_row}/({capacity}*{days_count}))"
-    )
-    for m in ["OCC", "ADR", "DOR", "RevPAR"]:
-        ws.cell(row=forecast_row, column=header_map[f"{m}_FC"]).number_format = ws.cell(row=2, column=header_map[f"{m}_FC"]).number_format
-
-    # 背景色設定
-    all_metrics = ["室数", "人数", "宿泊売上", "OCC", "ADR", "DOR", "RevPAR"]
-    budget_cols = [header_map[f"{m}_予算"] for m in all_metrics if f"{m}_予算" in header_map]
-    fc_cols = [header_map[f"{m}_FC"] for m in all_metrics if f"{m}_FC" in header_map]
-    for col in budget_cols:
-        for r in range(2, forecast_row + 1):
-            ws.cell(row=r, column=col).fill = budget_fill
-    for col in fc_cols:
-        for r in range(2, forecast_row + 1):
-            ws.cell(row=r, column=col).fill = fc_fill
-
-    diff_cols = [
-        header_map["差_OCC_FC-予算"],
-        header_map["差_ADR_FC-予算"],
-        header_map["差_売上_FC-予算"],
-        header_map["差_OCC_OH-FC"],
-        header_map["差_ADR_OH-FC"],
-        header_map["差_売上_OH-FC"],
-        header_map["差_OCC_実績-FC"],
-        header_map["差_ADR_実績-FC"],
-        header_map["差_売上_実績-FC"],
-    ]
-    for col in diff_cols:
-        for r in range(2, forecast_row + 1):
-            ws.cell(row=r, column=col).fill = PatternFill(
-                start_color="FFFAD0",
-                end_color="FFFAD0",
-                fill_type="solid",
-            )
-        col_letter = get_column_letter(col)
-        neg_rule = FormulaRule(
-            formula=[f"AND(ISNUMBER({col_letter}2),{col_letter}2<0)"],
-            font=Font(color="FF0000"),
+        forecast_values[HEADER_MAP["DOR_FC"] - 1] = (
+            f"=IF(OR({COL_LETTERS['人数_FC']}{forecast_row}=\"\", {COL_LETTERS['室数_FC']}{forecast_row}=\"\"), \"\", {COL_LETTERS['人数_FC']}{forecast_row}/{COL_LETTERS['室数_FC']}{forecast_row})"
         )
-        ws.conditional_formatting.add(
-            f"{col_letter}2:{col_letter}{forecast_row}",
-            neg_rule,
+        forecast_values[HEADER_MAP["RevPAR_FC"] - 1] = (
+            f"=IF({COL_LETTERS['宿泊売上_FC']}{forecast_row}=\"\", \"\", {COL_LETTERS['宿泊売上_FC']}{forecast_row}/({CAPACITY_NAME}*{days_count}))"
         )
+        grid.append(styled_row(ws, total_values, MONTH_ROW_LAYOUTS["edge"]))
+        grid.append(styled_row(ws, forecast_values, MONTH_ROW_LAYOUTS["edge"]))
 
-    summary_dict[(year, month)] = {
-        "sheet": ws.title,
-        "total_row": total_row,
-        "header_map": header_map,
-        "data_end_row": data_end_row,
-    }
-
-    # 罫線設定
-    block_ends = [
-        header_map["RevPAR_予算"],
-        header_map["RevPAR_FC"],
-        header_map["RevPAR_OH"],
-        header_map["RevPAR_実績"],
-    ]
-    for r in ws.iter_rows(min_row=1, max_row=forecast_row, max_col=ws.max_column):
-        for c in r:
-            c.border = Border(top=thin, bottom=thin, left=thin, right=thin)
-    for end_col in block_ends:
-        for row in range(1, forecast_row + 1):
-            cell = ws.cell(row=row, column=end_col)
-            cell.border = Border(
-                top=cell.border.top,
-                bottom=cell.border.bottom,
-                left=cell.border.left,
-                right=medium,
+        # 差異列はFC・OH・実績の後ろに3列ずつ並ぶため、3列ごとに1ルールで赤字化（数式は範囲左上からの相対参照）
+        for i in range(0, len(DIFF_NAMES), 3):
+            first = COL_LETTERS[DIFF_NAMES[i]]
+            last = COL_LETTERS[DIFF_NAMES[i + 2]]
+            neg_rule = FormulaRule(
+                formula=[f"AND(ISNUMBER({first}2),{first}2<0)"],
+                font=neg_font,
             )
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-        cell.border = Border(top=medium, bottom=medium, left=cell.border.left, right=cell.border.right)
-    for row_idx in [total_row, forecast_row]:
-        for cell in ws[row_idx]:
-            cell.border = Border(top=medium, bottom=medium, left=cell.border.left, right=cell.border.right)
+            ws.conditional_formatting.add(f"{first}2:{last}{forecast_row}", neg_rule)
 
+        summary_dict[(year, month)] = SheetInfo(ws.title, total_row, data_end_row)
 
+        for row_cells in grid:
+            ws.append(row_cells)
 
 # === 年間集計シート ===
 summary = wb.create_sheet(title="年間集計")
-metrics = ["室数", "人数", "宿泊売上", "OCC", "ADR", "DOR", "RevPAR"]
-kinds = ["予算", "FC", "OH", "実績"]
 month_labels: list[str] = []
 month_keys: list[tuple[int, int]] = []
 days: list[int] = []
-match = re.search(r"(20\d{2})", file_path)
-start_year = int(match.group(1)) if match else datetime.date.today().year
 year = start_year
 month = start_month
 for _ in range(12):
     month_labels.append(f"{year}年{month}月")
     month_keys.append((year, month))
     info = summary_dict.get((year, month))
-    days.append(info["data_end_row"] - 1 if info else 0)
+    days.append(info.data_end_row - 1 if info else 0)
     if month == 12:
         month = 1
         year += 1
     else:
         month += 1
 
+# 年間シートの表ブロック: (シート・背景色) × 行(見出し/指標) ごとの名前付きスタイル
+# 見出し行は太字（年間差異では上辺も太線）、最終行(RevPAR)は下辺を太線にする
+for prefix, fill, header_border in [
+    ("summary_budget", budget_fill, month_borders[(False, False)]),
+    ("summary_fc", fc_fill, month_borders[(False, False)]),
+    ("summary_plain", no_fill, month_borders[(False, False)]),
+    ("variance_budget", variance_budget_fill, block_edge_borders["top"]),
+    ("variance_fc", variance_fc_fill, block_edge_borders["top"]),
+]:
+    wb.add_named_style(
+        NamedStyle(
+            name=f"{prefix}_header",
+            font=bold_font,
+            fill=fill,
+            border=header_border,
+            number_format="General",
+        )
+    )
+    for metric in ALL_METRICS:
+        wb.add_named_style(
+            NamedStyle(
+                name=f"{prefix}_{metric}",
+                font=DEFAULT_FONT,
+                fill=fill,
+                border=block_edge_borders["bottom"] if metric == ALL_METRICS[-1] else month_borders[(False, False)],
+                number_format=NUMBER_FORMATS[metric],
+            )
+        )
+summary_groups = {
+    "予算": "summary_budget",
+    "FC": "summary_fc",
+    "OH": "summary_plain",
+    "実績": "summary_plain",
+}
+
 # ウィンドウ枠固定を解除
 # summary.freeze_panes = "B3"
 summary_totals: dict[str, dict[str, str]] = {}
-current_row = 1
-for kind in kinds:
-    summary.cell(row=current_row, column=1, value=kind).font = Font(bold=True)
-    header_row = current_row + 1
-    summary.cell(row=header_row, column=1, value="指標")
-    for idx, label in enumerate(month_labels, start=2):
-        summary.cell(row=header_row, column=idx, value=label)
-    total_col = len(month_labels) + 2
-    summary.cell(row=header_row, column=total_col, value="年間合計")
-    metric_rows: dict[str, int] = {}
-    for metric_idx, metric in enumerate(metrics, start=header_row + 1):
-        metric_rows[metric] = metric_idx
-        summary.cell(row=metric_idx, column=1, value=metric)
-        for m_idx, (y, m) in enumerate(month_keys, start=2):
-            cell = summary.cell(row=metric_idx, column=m_idx)
-            info = summary_dict.get((y, m))
-            if info:
-                sheet = wb[info["sheet"]]
-                hmap = info["header_map"]
-                tr = info["total_row"]
-                col = hmap.get(f"{metric}_{kind}")
-                if col:
-                    cell.value = f"='{sheet.title}'!{get_column_letter(col)}{tr}"
-                else:
-                    cell.value = 0
-            else:
-                cell.value = 0
-            cell.number_format = {
-                "室数": "#,##0",
-                "人数": "#,##0",
-                "宿泊売上": "#,##0",
-                "OCC": "0.0%",
-                "ADR": "#,##0",
-                "DOR": "0.00",
-                "RevPAR": "#,##0",
-            }[metric]
-        col_start = get_column_letter(2)
-        col_end = get_column_letter(total_col - 1)
-        total_cell = summary.cell(row=metric_idx, column=total_col)
-        if metric in ["室数", "人数", "宿泊売上", "DOR"]:
-            total_cell.value = f"=SUM({col_start}{metric_idx}:{col_end}{metric_idx})"
-        if metric in ["室数", "人数", "宿泊売上"]:
-            total_cell.number_format = "#,##0"
-        elif metric == "DOR":
-            total_cell.number_format = "0.00"
-        summary_totals.setdefault(kind, {})[metric] = total_cell.coordinate
-    days_sum = sum(days) if days else 0
+total_col = len(month_labels) + 2
+total_letter = get_column_letter(total_col)
+col_start = get_column_letter(2)
+col_end = get_column_letter(total_col - 1)
+month_infos = [summary_dict.get(key) for key in month_keys]
+# 各月シートの合計行セルへの参照（'2025年4月'!C33 など）を列名ごとに一度だけ組み立てる
+total_refs: list[dict[str, str] | None] = [
+    {name: f"'{info.sheet}'!{letter}{info.total_row}" for name, letter in COL_LETTERS.items()}
+    if info
+    else None
+    for info in month_infos
+]
+days_sum = sum(days)
+summary_rows: list[list] = []
+for kind in KINDS:
+    group = summary_groups[kind]
+    if summary_rows:
+        summary_rows.append([])
+    header_row = len(summary_rows) + 2
+    metric_rows = {metric: idx for idx, metric in enumerate(ALL_METRICS, start=header_row + 1)}
+    summary_totals[kind] = {metric: f"{total_letter}{row}" for metric, row in metric_rows.items()}
     room_total = summary_totals[kind]["室数"]
     pax_total = summary_totals[kind]["人数"]
     sales_total = summary_totals[kind]["宿泊売上"]
-    summary.cell(row=metric_rows["OCC"], column=total_col).value = (
-        f"=IFERROR({room_total}/{capacity}/{days_sum}, \"\")"
-    )
-    summary.cell(row=metric_rows["ADR"], column=total_col).value = (
-        f"=IFERROR({sales_total}/{room_total}, \"\")"
-    )
-    summary.cell(row=metric_rows["DOR"], column=total_col).value = (
-        f"=IFERROR({pax_total}/{room_total}, \"\")"
-    )
-    summary.cell(row=metric_rows["RevPAR"], column=total_col).value = (
-        f"=IFERROR({sales_total}/{capacity}/{days_sum}, \"\")"
-    )
-    for metric in ["OCC", "ADR", "DOR", "RevPAR"]:
-        summary.cell(row=metric_rows[metric], column=total_col).number_format = {
-            "OCC": "0.0%",
-            "ADR": "#,##0",
-            "DOR": "0.00",
-            "RevPAR": "#,##0",
-        }[metric]
-    block_end = header_row + len(metrics)
-    for r in range(header_row, block_end + 1):
-        for c in range(1, total_col + 1):
-            summary.cell(row=r, column=c).fill = (
-                budget_fill if kind == "予算" else fc_fill if kind == "FC" else PatternFill()
-            )
-    for cell in summary[header_row]:
-        cell.font = Font(bold=True)
-    for r in range(header_row - 1, block_end + 1):
-        for c in range(1, total_col + 1):
-            cell = summary.cell(row=r, column=c)
-            cell.border = Border(top=thin, bottom=thin, left=thin, right=thin)
-    for c in range(1, total_col + 1):
-        cell = summary.cell(row=block_end, column=c)
-        cell.border = Border(top=cell.border.top, bottom=medium, left=cell.border.left, right=cell.border.right)
-    current_row = block_end + 2
+    total_formulas = {
+        "OCC": f"=IFERROR({room_total}/{CAPACITY_NAME}/{days_sum}, \"\")",
+        "ADR": f"=IFERROR({sales_total}/{room_total}, \"\")",
+        "DOR": f"=IFERROR({pax_total}/{room_total}, \"\")",
+        "RevPAR": f"=IFERROR({sales_total}/{CAPACITY_NAME}/{days_sum}, \"\")",
+    }
+    values = [
+        [kind, *([None] * (total_col - 1))],
+        ["指標", *month_labels, "年間合計"],
+    ]
+    for metric, row in metric_rows.items():
+        name = f"{metric}_{kind}"
+        values.append(
+            [
+                metric,
+                *("=" + refs[name] if refs else 0 for refs in total_refs),
+                total_formulas.get(metric, f"=SUM({col_start}{row}:{col_end}{row})"),
+            ]
+        )
+    row_styles = ["thin_box", f"{group}_header", *(f"{group}_{metric}" for metric in ALL_METRICS)]
+    for row_values, style_name in zip(values, row_styles):
+        summary_rows.append(styled_row(summary, row_values, [(style_name, None)] * total_col))
+    # ブロック名のセルだけ太字
+    summary_rows[header_row - 2][0].font = bold_font
+for row_cells in summary_rows:
+    summary.append(row_cells)
 # === 年間差異シート ===
 variance = wb.create_sheet(title="年間差異")
+VARIANCE_BASE_TEMPLATE = '=IFERROR(IF(OR({l}="", {l}=0), "", {l}-{r}), "")'
+VARIANCE_RATIO_TEMPLATE = '=IFERROR(IF({l}="", "", {l}-{r}), "")'
 blocks = [
-    ("FC − 予算", "FC", "予算", PatternFill(start_color="DDEEFF", end_color="DDEEFF", fill_type="solid")),
-    ("実績 − 予算", "実績", "予算", PatternFill(start_color="DDEEFF", end_color="DDEEFF", fill_type="solid")),
-    ("OH − FC", "OH", "FC", PatternFill(start_color="DDFFDD", end_color="DDFFDD", fill_type="solid")),
-    ("実績 − FC", "実績", "FC", PatternFill(start_color="DDFFDD", end_color="DDFFDD", fill_type="solid")),
+    ("FC − 予算", "FC", "予算", "variance_budget"),
+    ("実績 − 予算", "実績", "予算", "variance_budget"),
+    ("OH − FC", "OH", "FC", "variance_fc"),
+    ("実績 − FC", "実績", "FC", "variance_fc"),
 ]
-for title, left, right, fill in blocks:
-    start_row = variance.max_row + 1
-    variance.cell(row=start_row, column=1, value=title).font = Font(bold=True)
-    header_row = start_row + 1
-    variance.cell(row=header_row, column=1, value="指標")
-    for idx, label in enumerate(month_labels, start=2):
-        variance.cell(row=header_row, column=idx, value=label)
-    total_col = len(month_labels) + 2
-    variance.cell(row=header_row, column=total_col, value="年間合計")
-    for cell in variance[header_row]:
-        cell.font = Font(bold=True)
-    metric_rows: dict[str, int] = {}
-    for metric_idx, metric in enumerate(metrics, start=header_row + 1):
-        metric_rows[metric] = metric_idx
-        variance.cell(row=metric_idx, column=1, value=metric)
-        for m_idx, (y, m) in enumerate(month_keys, start=2):
-            cell = variance.cell(row=metric_idx, column=m_idx)
-            info = summary_dict.get((y, m))
-            if info:
-                sheet = wb[info["sheet"]]
-                tr = info["total_row"]
-                hmap = info["header_map"]
-                l_col = hmap.get(f"{metric}_{left}")
-                r_col = hmap.get(f"{metric}_{right}")
-                if l_col and r_col:
-                    l_addr = f"'{sheet.title}'!{get_column_letter(l_col)}{tr}"
-                    r_addr = f"'{sheet.title}'!{get_column_letter(r_col)}{tr}"
-                    if metric in ["室数", "人数", "宿泊売上"]:
-                        base_formula = f"IF(OR({l_addr}=\"\", {l_addr}=0), \"\", {l_addr}-{r_addr})"
-                    else:
-                        base_formula = f"IF({l_addr}=\"\", \"\", {l_addr}-{r_addr})"
-                    cell.value = f"=IFERROR({base_formula}, \"\")"
-            cell.number_format = {
-                "室数": "#,##0",
-                "人数": "#,##0",
-                "宿泊売上": "#,##0",
-                "OCC": "0.0%",
-                "ADR": "#,##0",
-                "DOR": "0.00",
-                "RevPAR": "#,##0",
-            }[metric]
-    col_start = get_column_letter(2)
-    col_end = get_column_letter(total_col - 1)
-    for metric in metrics:
-        row = metric_rows[metric]
-        cell = variance.cell(row=row, column=total_col)
-        if metric in ["室数", "人数", "宿泊売上", "DOR"]:
-            cell.value = f"=SUM({col_start}{row}:{col_end}{row})"
-        elif metric == "OCC":
-            l_room = summary_totals[left]["室数"]
-            r_room = summary_totals[right]["室数"]
-            cell.value = f"=IFERROR('年間集計'!{l_room}/{capacity}/{sum(days)}-'年間集計'!{r_room}/{capacity}/{sum(days)}, \"\")"
-        elif metric == "ADR":
-            l_room = summary_totals[left]["室数"]
-            r_room = summary_totals[right]["室数"]
-            l_sales = summary_totals[left]["宿泊売上"]
-            r_sales = summary_totals[right]["宿泊売上"]
-            cell.value = f"=IFERROR('年間集計'!{l_sales}/'年間集計'!{l_room}-'年間集計'!{r_sales}/'年間集計'!{r_room}, \"\")"
-        elif metric == "RevPAR":
-            l_sales = summary_totals[left]["宿泊売上"]
-            r_sales = summary_totals[right]["宿泊売上"]
-            cell.value = f"=IFERROR('年間集計'!{l_sales}/{capacity}/{sum(days)}-'年間集計'!{r_sales}/{capacity}/{sum(days)}, \"\")"
-        cell.number_format = {
-            "室数": "#,##0",
-            "人数": "#,##0",
-            "宿泊売上": "#,##0",
-            "OCC": "0.0%",
-            "ADR": "#,##0",
-            "DOR": "0.00",
-            "RevPAR": "#,##0",
-        }[metric]
-    block_end = header_row + len(metrics)
-    for r in range(header_row, block_end + 1):
-        for c in range(1, total_col + 1):
-            variance.cell(row=r, column=c).fill = fill
-            variance.cell(row=r, column=c).border = Border(top=thin, bottom=thin, left=thin, right=thin)
-    for c in range(1, total_col + 1):
-        cell = variance.cell(row=header_row, column=c)
-        cell.border = Border(top=medium, bottom=cell.border.bottom, left=cell.border.left, right=cell.border.right)
-        cell = variance.cell(row=block_end, column=c)
-        cell.border = Border(top=cell.border.top, bottom=medium, left=cell.border.left, right=cell.border.right)
-    for idx in range(2, total_col + 1):
-        col_letter = get_column_letter(idx)
-        neg_rule = FormulaRule(
-            formula=[f"AND(ISNUMBER({col_letter}{header_row + 1}),{col_letter}{header_row + 1}<0)"],
-            font=Font(color="FF0000"),
-        )
-        variance.conditional_formatting.add(
-            f"{col_letter}{header_row + 1}:{col_letter}{block_end}", neg_rule
-        )
+
+variance_rows: list[list[WriteOnlyCell]] = [[]]
+for title, left, right, group in blocks:
+    title_cell = WriteOnlyCell(variance, value=title)
+    title_cell.font = bold_font
+    variance_rows.append([title_cell])
+    header_row = len(variance_rows) + 1
+    block_end = header_row + len(ALL_METRICS)
+    l_room = f"'年間集計'!{summary_totals[left]['室数']}"
+    r_room = f"'年間集計'!{summary_totals[right]['室数']}"
+    l_sales = f"'年間集計'!{summary_totals[left]['宿泊売上']}"
+    r_sales = f"'年間集計'!{summary_totals[right]['宿泊売上']}"
+    total_formulas = {
+        "OCC": f"=IFERROR({l_room}/{CAPACITY_NAME}/{days_sum}-{r_room}/{CAPACITY_NAME}/{days_sum}, \"\")",
+        "ADR": f"=IFERROR({l_sales}/{l_room}-{r_sales}/{r_room}, \"\")",
+        "RevPAR": f"=IFERROR({l_sales}/{CAPACITY_NAME}/{days_sum}-{r_sales}/{CAPACITY_NAME}/{days_sum}, \"\")",
+    }
+    values = [["指標", *month_labels, "年間合計"]]
+    for row, metric in enumerate(ALL_METRICS, start=header_row + 1):
+        l_name = f"{metric}_{left}"
+        r_name = f"{metric}_{right}"
+        # 実数の指標は左側が0（未入力扱い）のときも空欄にする
+        template = VARIANCE_BASE_TEMPLATE if metric in BASE_METRICS else VARIANCE_RATIO_TEMPLATE
+        values.append(
+            [
+                metric,
+                *(template.format(l=refs[l_name], r=refs[r_name]) if refs else None for refs in total_refs),
+                total_formulas.get(metric, f"=SUM({col_start}{row}:{col_end}{row})"),
+            ]
+        )
+    # 背景色・罫線・太字・表示形式は行ごとの名前付きスタイルで1回だけ設定
+    row_styles = [f"{group}_header", *(f"{group}_{metric}" for metric in ALL_METRICS)]
+    for row_values, style_name in zip(values, row_styles):
+        variance_rows.append(styled_row(variance, row_values, [(style_name, None)] * total_col))
+    first_value = f"{col_start}{header_row + 1}"
+    neg_rule = FormulaRule(
+        formula=[f"AND(ISNUMBER({first_value}),{first_value}<0)"],
+        font=neg_font,
+    )
+    variance.conditional_formatting.add(
+        f"{first_value}:{total_letter}{block_end}", neg_rule
+    )
+for row_cells in variance_rows:
+    variance.append(row_cells)
 
 # === 保存 ===
-match = re.search(r"(20\d{2})", file_path)
-year_str = match.group(1) if match else str(datetime.date.today().year)
-out_path = f"予実管理表_{year_str}年度.xlsx"
+out_path = f"予実管理表_{start_year}年度.xlsx"
 wb.save(out_path)
 print(f"✅ 出力完了: {out_path}")
-